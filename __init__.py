@@ -41,7 +41,8 @@ from .src.geometry import (HasXYPositionMixin,
                            Arc,
                            Irat)
 
-from .src.iterable import (rangeinf,
+from .src.iterable import (INF,
+                           rangeinf,
                            single_true,
                            slice_pieces,
                            ResetableGenerator)
@@ -89,8 +90,10 @@ from .src.strings import (is_magic,
                           re_sub_recursive,
                           UniqueString)
 
-from .src.subprocess import shell
+from .src.subprocess import (shell,
+                             ShellPool)
 
 from .src.wrapper import (time_func,
+                          time_func_ns,
                           compose,
                           getitemfn)
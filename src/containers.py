@@ -1,10 +1,9 @@
 """Objects for storing data."""
 
+import bisect
 import collections
 import weakref
 
-from . import strings
-
 
 class Record:
     """Creates a record datatype, roughly equivalent to a mutable tuple with named entries.
@@ -218,7 +217,13 @@ class Record:
                     setattr(self, key, val)
 
 
+# Sentinel for _ObjectMixin.__getattr__, below.
+_missing = object()
+
+
 class _ObjectMixin(dict):
+    __slots__ = ()
+
     def __init__(self, **kwargs):
         for key, val in kwargs.items():
             self[key] = self._wrapper(val)
@@ -236,10 +241,13 @@ class _ObjectMixin(dict):
         return self
     
     def __getattr__(self, item):
-        try:
-            return self.__getitem__(item)
-        except KeyError as e:
-            raise AttributeError(e) from e
+        # This is only called once normal attribute lookup has failed, i.e. for entries stored in the dictionary.
+        # Looking up via dict.get with a sentinel avoids raising-then-chaining a KeyError on misses, which is
+        # (surprisingly) expensive.
+        value = dict.get(self, item, _missing)
+        if value is _missing:
+            raise AttributeError(item)
+        return value
 
     def __dir__(self):
         return super(_ObjectMixin, self).__dir__() + [str(k) for k in self.keys()]
@@ -261,24 +269,71 @@ class _ObjectMixin(dict):
 
 
 class _SortedMixin(collections.OrderedDict):
-    def __setitem__(self, key, value, *args, **kwargs):
-        shifted_keys = []
-        shifted_values = []
-        items = iter(list(self.items()))
-        for key_, value_ in items:
-            if key < key_:
-                shifted_keys.append(key_)
-                shifted_values.append(value_)
-                break
-        for key_, value_ in items:
-            shifted_keys.append(key_)
-            shifted_values.append(value_)
-        for key_ in shifted_keys:
-            del self[key_]
+    __slots__ = ('_sorted_keys',)
+
+    def _get_sorted_keys(self):
+        # A parallel list of our keys, maintained in sorted order, so that each insertion only needs a binary
+        # search rather than a scan of the whole dictionary.
+        # Set lazily rather than in __init__, both so that we cope with routes that bypass __init__ (e.g.
+        # unpickling), and because _ObjectMixin.__setattr__ would turn a regular attribute assignment into an
+        # item assignment; hence also the explicit object.__setattr__.
+        try:
+            return self._sorted_keys
+        except AttributeError:
+            sorted_keys = list(self.keys())
+            object.__setattr__(self, '_sorted_keys', sorted_keys)
+            return sorted_keys
 
+    def __setitem__(self, key, value, *args, **kwargs):
+        sorted_keys = self._get_sorted_keys()
+        index = bisect.bisect_left(sorted_keys, key)
+        if index < len(sorted_keys) and sorted_keys[index] == key:
+            # The bisect hit is only trusted if the key is really present: a mutator that bypassed us could have
+            # left a stale entry behind, and treating that as an overwrite would put the new key in the wrong place.
+            if key in self:
+                # Overwriting an existing key; the order doesn't change.
+                super(_SortedMixin, self).__setitem__(key, value, *args, **kwargs)
+                return
+            del sorted_keys[index]
+
+        sorted_keys.insert(index, key)
         super(_SortedMixin, self).__setitem__(key, value, *args, **kwargs)
-        for key_, value_ in zip(shifted_keys, shifted_values):
-            super(_SortedMixin, self).__setitem__(key_, value_, *args, **kwargs)
+        # The new key was appended at the end, so shuffle every key that should come after it along by one.
+        for key_ in sorted_keys[index + 1:]:
+            self.move_to_end(key_)
+
+    def __delitem__(self, key, *args, **kwargs):
+        super(_SortedMixin, self).__delitem__(key, *args, **kwargs)
+        self._discard_sorted_key(key)
+
+    def _discard_sorted_key(self, key):
+        sorted_keys = self._get_sorted_keys()
+        index = bisect.bisect_left(sorted_keys, key)
+        if index < len(sorted_keys) and sorted_keys[index] == key:
+            del sorted_keys[index]
+
+    def __reduce__(self):
+        # _sorted_keys mustn't end up in the copy/pickle state: applied as slot state it goes stale before the items
+        # are re-inserted (and for Objects it would route through __setattr__ and land in the dictionary itself).
+        # It's rebuilt lazily on the other side instead. Items re-inserted via the iterator go through __setitem__,
+        # so they arrive in order.
+        return self.__class__, (), None, None, iter(self.items())
+
+    # The C-level mutators below don't route through __setitem__/__delitem__, so they're overridden to keep the
+    # sorted-keys list in sync.
+    def clear(self):
+        super(_SortedMixin, self).clear()
+        del self._get_sorted_keys()[:]
+
+    def pop(self, key, *args, **kwargs):
+        value = super(_SortedMixin, self).pop(key, *args, **kwargs)
+        self._discard_sorted_key(key)
+        return value
+
+    def popitem(self, *args, **kwargs):
+        key, value = super(_SortedMixin, self).popitem(*args, **kwargs)
+        self._discard_sorted_key(key)
+        return key, value
 
 
 # Yes yes, technically this is exactly the same as _ObjectMixin because that already specifies that dict comes earlier
@@ -292,16 +347,19 @@ class Object(_ObjectMixin, dict):
     Basically just a convenience instead of using a plain class or types.SimpleNamespace, besides the fact that it
     supports the [] notation.
     """
+    __slots__ = ()
 
 
 class OrderedObject(_ObjectMixin, collections.OrderedDict):
     """An Object which remembers the order its attributes were added in."""
+    __slots__ = ()
 
 
 class SortedObject(_SortedMixin, OrderedObject):
     """An Object which keeps all of its attributes sorted. The usual [] notation can still be used as it can for regular
     Objects, but note that passing non-strings this way will not work in general, as these non-strings cannot be
     compared to the strings which the attributes are stored with, and thus no notion of sorting would make sense."""
+    __slots__ = ()
 
 
 # And yes, this is technically the same as _SortedMixin, same as Object and _ObjectMixin.
@@ -309,9 +367,12 @@ class SortedDict(_SortedMixin, collections.OrderedDict):
     """A dictionary which keeps its key: value pairs sorted by key. Note that this means that all of its keys must be
     comparable to each other; for instance you cannot have both 1 and '1' as keys, as integers and strings are not
     comparable."""
+    __slots__ = ()
 
 
 class _nonneg_indexing:
+    __slots__ = ()
+
     def __getitem__(self, item):
         try:
             # In case :item: is a slice
@@ -326,29 +387,36 @@ class _nonneg_indexing:
 
 class nonneg_deque(_nonneg_indexing, collections.deque):
     """As collections.deque, but only supports positive indexing."""
+    __slots__ = ()
 
 
 class nonneg_list(_nonneg_indexing, list):
     """As collections.deque, but only supports positive indexing."""
+    __slots__ = ()
 
 
 class qlist(nonneg_list):
     """A list which quietly ignores all IndexErrors, and only accepts non-negative indices. Useful to avoid
     having to write lots of try-except code to handle the edges of the list."""
+    __slots__ = ('except_val',)
 
     class Eater:
         """Used by qlist to quietly ignore anything chaining off of its result."""
+        __slots__ = ()
 
         def __getattribute__(self, item):
             return self
 
-        def __getitem__(self, item):
-            return self
+        # Does exactly the same thing, so share the single method object.
+        __getitem__ = __getattribute__
 
         def __call__(self, *args, **kwargs):
             return self
 
-    def __init__(self, *args, except_val=Eater(), **kwargs):
+    # Eater is stateless, so every qlist may share the same instance.
+    _eater = Eater()
+
+    def __init__(self, *args, except_val=_eater, **kwargs):
         self.except_val = except_val
         super(qlist, self).__init__(*args, **kwargs)
 
@@ -361,6 +429,8 @@ class qlist(nonneg_list):
 
 
 class _delmixin:
+    __slots__ = ()
+
     def __delitem__(self, key):
         try:
             super(_delmixin, self).__delitem__(key)
@@ -370,7 +440,9 @@ class _delmixin:
 
 class deldict(_delmixin, dict):
     """A dictionary that doesn't mind about bad del attempts."""
+    __slots__ = ()
 
 
 class deldefaultdict(_delmixin, collections.defaultdict):
     """A collections.defaultdict that doesn't mind about bad del attempts."""
+    __slots__ = ()
@@ -44,6 +44,28 @@ class MultiWith(WithAdder):
             context.__exit__(exc_type, exc_val, exc_tb)
 
 
+class _VariableSetter(WithAdder):
+    """The context returned by set_context_variables, below."""
+
+    def __init__(self, owner, variable_names, value, callback, **kwargs):
+        self.owner = owner
+        self.variable_names = variable_names
+        self.value = value
+        self.callback = callback
+        super(_VariableSetter, self).__init__(**kwargs)
+
+    def __enter__(self):
+        self.old_variable_values = {}
+        for variable_name in self.variable_names:
+            self.old_variable_values[variable_name] = deepattr.deepgetattr(self.owner, variable_name)
+            deepattr.deepsetattr(self.owner, variable_name, self.value)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for variable_name in self.variable_names:
+            deepattr.deepsetattr(self.owner, variable_name, self.old_variable_values[variable_name])
+        self.callback()
+
+
 def set_context_variables(owner, variable_names, value=True, callback=lambda: None):
     """Allows for easily creating objects to be used in 'with' statements, which set particular variables to particular
     values inside the context. Can also have an optional callback called on __exit__.
@@ -63,21 +85,9 @@ def set_context_variables(owner, variable_names, value=True, callback=lambda: No
     # Easy mistake to make
     assert not isinstance(variable_names, str), "Pass a list of variable names, not a single variable name."
 
-    variable_names = list(variable_names)
-
-    class VariableSetter(WithAdder):
-        def __enter__(self):
-            self.old_variable_values = {}
-            for variable_name in variable_names:
-                self.old_variable_values[variable_name] = deepattr.deepgetattr(owner, variable_name)
-                deepattr.deepsetattr(owner, variable_name, value)
-
-        def __exit__(self, exc_type, exc_val, exc_tb):
-            for variable_name in variable_names:
-                deepattr.deepsetattr(owner, variable_name, self.old_variable_values[variable_name])
-            callback()
-
-    return VariableSetter()
+    # Defining the class at module scope, rather than closing over our arguments here, means each call only pays for
+    # creating an instance rather than for creating a whole class.
+    return _VariableSetter(owner, list(variable_names), value, callback)
 
 
 class WithNothing:
@@ -1,98 +1,159 @@
+import concurrent.futures
 import json
 import os
+import pickle
+import re
+
+try:
+    # Considerably quicker at parsing the multi-megabyte JSON blobs that notebooks with outputs can be.
+    import orjson
+except ImportError:
+    orjson = None
 
 from . import containers as con
 from . import num
-from . import strings
+
+
+# Classifies a line as whitespace, comment, or docstring-delimiter in a single C-level match, rather than a chain of
+# Python-level strip/startswith tests per line. Lines matching none of these are code. Operates on bytes: counting
+# doesn't need the lines decoded, and skipping the decode is measurably quicker on big files.
+_line_classifier = re.compile(rb'(?P<whitespace>\s*$)|(?P<comment>\s*#)|(?P<docstring>\s*""")').match
 
 
 class _File:
+    # total_lines is a plain slot rather than a property: a _File's counts never change after creation, and a direct
+    # attribute read is cheaper than a descriptor call in _print_result's loops.
+    __slots__ = ('name', 'code_lines', 'comment_lines', 'whitespace_lines', 'total_lines')
+
     def __init__(self, name, lines):
         self.name = name
 
         self.code_lines = lines.code
         self.comment_lines = lines.comment
         self.whitespace_lines = lines.whitespace
-
-    @property
-    def total_lines(self):
-        return self.code_lines + self.comment_lines + self.whitespace_lines
+        self.total_lines = lines.code + lines.comment + lines.whitespace
 
 
 class _Folder:
+    __slots__ = ('name', 'dirpath', 'files', 'subfolder_names', 'code_lines', 'comment_lines', 'whitespace_lines',
+                 'total_lines')
+
     def __init__(self, dirpath, files, subfolder_names):
         self.name = dirpath.split(os.path.sep)[-1]
         self.dirpath = dirpath
         self.files = files
         self.subfolder_names = subfolder_names
 
-        self.code_lines = 0
-        self.comment_lines = 0
-        self.whitespace_lines = 0
-        for file in self.files:
-            self.code_lines += file.code_lines
-            self.comment_lines += file.comment_lines
-            self.whitespace_lines += file.whitespace_lines
-
-    @property
-    def total_lines(self):
-        return self.code_lines + self.comment_lines + self.whitespace_lines
-
-    def add_lines_from_subfolders(self, all_folders):
-        """Goes through all of this folder's immediate subfolders and adds on their current counts for their lines of
-        code/comment/whitespace."""
-
-        for subfolder_name in self.subfolder_names:
-            subfolder_path = os.path.join(self.dirpath, subfolder_name)
-            try:
-                subfolder = all_folders[subfolder_path]
-            # If a folder requires privileges to open then it will erroneously be viewable as a valid subfolder, despite
-            # not featuring in all_folders. There doesn't seem to be an easy cross-platform way of checking this, so
-            # EAFP it is.
-            except KeyError:
-                pass
-            else:
-                self.code_lines += subfolder.code_lines
-                self.comment_lines += subfolder.comment_lines
-                self.whitespace_lines += subfolder.whitespace_lines
+        self.code_lines = sum(file.code_lines for file in files)
+        self.comment_lines = sum(file.comment_lines for file in files)
+        self.whitespace_lines = sum(file.whitespace_lines for file in files)
+        # Kept up to date by _add_lines_from_subfolders when subfolder counts are rolled up.
+        self.total_lines = self.code_lines + self.comment_lines + self.whitespace_lines
+
+
+def _add_lines_from_subfolders(folders, dirpath):
+    """Rolls the counts of every (sub)subfolder of the folder at :dirpath: up into their parents, in a single
+    post-order traversal."""
+
+    folder = folders[dirpath]
+    for subfolder_name in folder.subfolder_names:
+        subfolder_path = os.path.join(dirpath, subfolder_name)
+        try:
+            subfolder = folders[subfolder_path]
+        # If a folder requires privileges to open then it will erroneously be viewable as a valid subfolder, despite
+        # not featuring in folders. There doesn't seem to be an easy cross-platform way of checking this, so
+        # EAFP it is.
+        except KeyError:
+            continue
+        _add_lines_from_subfolders(folders, subfolder_path)
+        folder.code_lines += subfolder.code_lines
+        folder.comment_lines += subfolder.comment_lines
+        folder.whitespace_lines += subfolder.whitespace_lines
+        folder.total_lines += subfolder.total_lines
 
 
 def loc_count_in_file(file_path):
     """Counts the lines of Python code, comments and whitespace in a file located at :file_path:."""
 
-    line_count = con.Record(code=0, comment=0, whitespace=0)
+    if file_path.endswith('.py'):
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    elif file_path.endswith('ipynb'):
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        cells = (json if orjson is None else orjson).loads(raw)['cells']
+        sources = []
+        for cell in cells:
+            if cell['cell_type'] == 'code':
+                source = ''.join(cell['source'])
+                # Cell sources usually already end in a newline; strip one so the join below doesn't manufacture a
+                # blank line at every cell boundary and inflate the whitespace count.
+                if source.endswith('\n'):
+                    source = source[:-1]
+                sources.append(source)
+        data = '\n'.join(sources).encode()
+    else:
+        raise RuntimeError("Unrecognised file type at '{}'".format(file_path))
+
+    # Local integers here, rather than incrementing Record attributes in the loop: attribute stores go through
+    # Record's __slots__ descriptors, whereas local-variable stores are nearly free.
+    code = comment = whitespace = 0
     currently_in_docstring = False
 
-    with open(file_path, 'r') as f:
-        if file_path.endswith('.py'):
-            lines = f.readlines()
-        elif file_path.endswith('ipynb'):
-            lines = []
-            cells = json.load(f)['cells']
-            for cell in cells:
-                if cell['cell_type'] == 'code':
-                    lines.extend(cell['source'])
+    for line in data.splitlines():
+        if currently_in_docstring:
+            comment += 1
+            if line.rstrip().endswith(b'"""'):
+                currently_in_docstring = False
+            continue
+        match = _line_classifier(line)
+        if match is None:
+            code += 1
         else:
-            raise RuntimeError("Unrecognised file type at '{}'".format(file_path))
-
-        for line in lines:
-            line = line.strip()
-            if currently_in_docstring:
-                line_count.comment += 1
-                if line.endswith('"""'):
-                    currently_in_docstring = False
-            elif line == '':
-                line_count.whitespace += 1
-            elif line.startswith('#'):
-                line_count.comment += 1
-            elif line.startswith('"""'):
-                line_count.comment += 1
-                if line == '"""' or not line.endswith('"""'):
+            # Dispatch on the matched group's index - an integer comparison - rather than its name.
+            group = match.lastindex
+            if group == 1:  # whitespace
+                whitespace += 1
+            elif group == 2:  # comment
+                comment += 1
+            else:  # docstring delimiter
+                comment += 1
+                line = line.strip()
+                if line == b'"""' or not line.endswith(b'"""'):
                     currently_in_docstring = True
-            else:
-                line_count.code += 1
 
-    return line_count
+    return con.Record(code=code, comment=comment, whitespace=whitespace)
+
+
+# Used as the worker function when counting files across a process pool. A plain tuple is returned rather than the
+# Record that loc_count_in_file produces, as Record's dynamically-created subclasses don't survive pickling.
+def _loc_count_in_file_tuple(file_path):
+    line_count = loc_count_in_file(file_path)
+    return line_count.code, line_count.comment, line_count.whitespace
+
+
+# Where the (optional) persistent cache of per-file counts lives; see the use_cache argument of loc_count.
+# Entries are keyed by absolute path, with values (st_mtime_ns, st_size, code, comment, whitespace).
+_cache_path = os.path.join(os.path.expanduser('~'), '.cache', 'loc_count', 'cache.pkl')
+
+
+def _load_cache():
+    try:
+        with open(_cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # Missing, unreadable or corrupted cache; just start afresh.
+        return {}
+
+
+def _save_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(_cache_path), exist_ok=True)
+        with open(_cache_path, 'wb') as f:
+            pickle.dump(cache, f)
+    except OSError:
+        # A read-only home directory shouldn't stop us from returning results.
+        pass
 
 
 def _print_result(print_files, print_folders, folders, print_fn, folder_path, include_zero):
@@ -106,64 +167,74 @@ def _print_result(print_files, print_folders, folders, print_fn, folder_path, in
             first_heading_str = "Folder location"
         else:
             top = folders[folder_path]
-            print_fn(f'Code: {top.code_lines}')
-            print_fn(f'Comment: {top.comment_lines}')
-            print_fn(f'Whitespace: {top.whitespace_lines}')
-            print_fn(f'Total: {top.total_lines}')
+            print_fn(f'Code: {top.code_lines}\n'
+                     f'Comment: {top.comment_lines}\n'
+                     f'Whitespace: {top.whitespace_lines}\n'
+                     f'Total: {top.total_lines}')
             return
-    max_folder_loc = len(first_heading_str)
-    max_code = len("Code")
-    max_comment = len("Comment")
-    max_whitespace = len("Whitespace")
-    max_all = len("Total")
-    for folder_loc, folder in folders.items():
-        if include_zero or folder.code_lines != 0:
-            if print_folders:
-                max_folder_loc = max(max_folder_loc, len(folder_loc))
-                max_code = max(max_code, num.num_digits(folder.code_lines))
-                max_comment = max(max_comment, num.num_digits(folder.comment_lines))
-                max_whitespace = max(max_whitespace, num.num_digits(folder.whitespace_lines))
-                max_all = max(max_all, num.num_digits(folder.total_lines))
-            if print_files:
-                for file in folder.files:
-                    if include_zero or file.code_lines != 0:
-                        file_loc = os.path.join(folder_loc, file.name)
-                        max_folder_loc = max(max_folder_loc, len(file_loc))
-                        max_code = max(max_code, num.num_digits(file.code_lines))
-                        max_comment = max(max_comment, num.num_digits(file.comment_lines))
-                        max_whitespace = max(max_whitespace, num.num_digits(file.whitespace_lines))
-                        max_all = max(max_all, num.num_digits(file.total_lines))
-
-    print_str = ("{:<%s} | {:%s} | {:%s} | {:%s} | {:%s}" % (max_folder_loc, max_code, max_comment, max_whitespace,
-                                                             max_all)
-                 ).format(first_heading_str, "Code", "Comment", "Whitespace", "Total")
-    print_fn(print_str)
-    print_fn("-" * (max_folder_loc + 1) + "+" + "-" * (max_code + 2) + "+" + "-" * (max_comment + 2) + "+" +
-             "-" * (max_whitespace + 2) + "+" + "-" * (max_all + 1))
-
-    # Starting to look a bit spaghettified this!
+    # Gather everything to be printed in a single pass; the column widths are then each a single max() over the
+    # collected rows, rather than duplicating the whole folders/files iteration just to measure it.
+    rows = []
     for folder_loc, folder in folders.items():
         if include_zero or folder.code_lines != 0:
             if print_folders:
-                print_str = ("{:<%s} | {:%s} | {:%s} | {:%s} | {:%s}" % (max_folder_loc, max_code, max_comment,
-                                                                         max_whitespace, max_all)
-                             ).format(folder_loc, folder.code_lines, folder.comment_lines, folder.whitespace_lines,
-                                      folder.code_lines + folder.comment_lines + folder.whitespace_lines)
-                print_fn(print_str)
+                rows.append((folder_loc, folder.code_lines, folder.comment_lines, folder.whitespace_lines,
+                             folder.total_lines))
             if print_files:
                 for file in folder.files:
                     if include_zero or file.code_lines != 0:
                         file_loc = os.path.join(folder_loc, file.name)
-                        print_str = ("{:<%s} | {:%s} | {:%s} | {:%s} | {:%s}" % (max_folder_loc, max_code,
-                                                                                 max_comment, max_whitespace,
-                                                                                 max_all)
-                                     ).format(file_loc, file.code_lines, file.comment_lines, file.whitespace_lines,
-                                              file.code_lines + file.comment_lines + file.whitespace_lines)
-                        print_fn(print_str)
+                        rows.append((file_loc, file.code_lines, file.comment_lines, file.whitespace_lines,
+                                     file.total_lines))
+
+    max_folder_loc = max(max((len(row[0]) for row in rows), default=0), len(first_heading_str))
+    max_code = max(max((num.num_digits(row[1]) for row in rows), default=0), len("Code"))
+    max_comment = max(max((num.num_digits(row[2]) for row in rows), default=0), len("Comment"))
+    max_whitespace = max(max((num.num_digits(row[3]) for row in rows), default=0), len("Whitespace"))
+    max_all = max(max((num.num_digits(row[4]) for row in rows), default=0), len("Total"))
+
+    # Build the row template once, assemble all the output, and hand it over in a single call; much quicker than
+    # formatting-and-printing line by line.
+    row_format = ("{:<%s} | {:%s} | {:%s} | {:%s} | {:%s}" % (max_folder_loc, max_code, max_comment, max_whitespace,
+                                                              max_all)).format
+    out = [row_format(first_heading_str, "Code", "Comment", "Whitespace", "Total"),
+           "-" * (max_folder_loc + 1) + "+" + "-" * (max_code + 2) + "+" + "-" * (max_comment + 2) + "+" +
+           "-" * (max_whitespace + 2) + "+" + "-" * (max_all + 1)]
+    for row in rows:
+        out.append(row_format(*row))
+    print_fn('\n'.join(out))
+
+
+def _walk(dirpath, hidden_folders):
+    """As os.walk, except that (a) hidden and __pycache__ folders are pruned during the walk itself, and (b) the
+    files are yielded as os.DirEntry objects, whose cached name/path avoid re-statting and re-joining paths."""
+
+    subdirnames = []
+    file_entries = []
+    try:
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirname = entry.name
+                    if not hidden_folders and subdirname.startswith('.'):
+                        # Hidden folder
+                        continue
+                    if subdirname == '__pycache__':
+                        continue
+                    subdirnames.append(subdirname)
+                else:
+                    file_entries.append(entry)
+    except PermissionError:
+        # A folder requiring privileges to open just doesn't get counted, as with os.walk.
+        return
+    yield dirpath, subdirnames, file_entries
+    for subdirname in subdirnames:
+        yield from _walk(os.path.join(dirpath, subdirname), hidden_folders)
 
 
 def loc_count(folder_path='.', hidden_files=False, hidden_folders=False, print_result=True, include_zero=False,
-              add_subfolders=True, print_files=False, print_folders=True, returnval=False, print_fn=print):
+              add_subfolders=True, print_files=False, print_folders=True, returnval=False, print_fn=print,
+              processes=None, threads=None, use_cache=False):
     """
     Counts the number of lines of code in a folder.
 
@@ -180,6 +251,13 @@ def loc_count(folder_path='.', hidden_files=False, hidden_folders=False, print_r
         returnval: Boolean. Whether or not to return something. Defaults to False.
         print_fn: Function. The function to call when printing the result, if :print_result: is True. Defaults to
         the builtin print function.
+        processes: Optional integer. If set then the files will be counted in parallel across this many processes,
+            which is worthwhile on large directory trees. Defaults to None, meaning counting in-process.
+        threads: Optional integer. As :processes:, but using threads; cheaper to spin up, and file reads release
+            the GIL, so reads overlap with counting. Ignored if :processes: is also set. Defaults to None.
+        use_cache: Boolean, whether to cache per-file counts persistently (in ~/.cache/loc_count), keyed on each
+            file's modification time and size. Files unchanged since the previous run are then not reparsed.
+            Defaults to False.
     Returns:
         If returnval is truthy, then it is a dictionary, with the keys being the paths to folders, and the values being
         _Folder objects.
@@ -188,38 +266,78 @@ def loc_count(folder_path='.', hidden_files=False, hidden_folders=False, print_r
     will be printed instead.
     """
     
-    folder_path = strings.split(['/', '\\'], folder_path)
-    folder_path = os.path.join(*folder_path)
+    # Normalise the separators to the local convention. (os.path.normpath also handles absolute paths and redundant
+    # separators correctly, unlike re-splitting and re-joining by hand.)
+    folder_path = os.path.normpath(folder_path)
 
-    folders = {}
-    for dirpath, subdirnames, filenames in os.walk(folder_path):
-        unhidden_subdirnames = []
-        for subdirname in subdirnames:
-            if not hidden_folders and subdirname.startswith('.'):
-                # Hidden folder
-                continue
-            if subdirname == '__pycache__':
-                continue
-            unhidden_subdirnames.append(subdirname)
-
-        files = []
-        for filename in filenames:
+    # First collect which files we're going to count, so that the counting itself can optionally be farmed out to a
+    # process pool.
+    folder_contents = {}
+    file_paths = []
+    for dirpath, subdirnames, file_entries in _walk(folder_path, hidden_folders):
+        counted_filenames = []
+        for entry in file_entries:
+            filename = entry.name
             if not hidden_files and filename.startswith('.'):
                 # Hidden file
                 continue
-            if filename.endswith('.py') or filename.endswith('.ipynb'):
-                file_path = os.path.join(dirpath, filename)
-                file_lines = loc_count_in_file(file_path)
-                file = _File(filename, file_lines)
-                files.append(file)
+            if filename.endswith(('.py', '.ipynb')):
+                counted_filenames.append(filename)
+                file_paths.append(entry.path)
+
+        folder_contents[dirpath] = (counted_filenames, subdirnames)
+
+    # Resolve what we can from the cache (if enabled); anything left over actually gets counted.
+    line_count_per_path = {}
+    if use_cache:
+        cache = _load_cache()
+        uncached_file_paths = []
+        for file_path in file_paths:
+            abs_path = os.path.abspath(file_path)
+            stat = os.stat(abs_path)
+            entry = cache.get(abs_path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                line_count_per_path[file_path] = con.Record(code=entry[2], comment=entry[3], whitespace=entry[4])
+            else:
+                uncached_file_paths.append(file_path)
+    else:
+        cache = None
+        uncached_file_paths = file_paths
 
+    if processes is not None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            counted = [con.Record(code=code, comment=comment, whitespace=whitespace)
+                       for code, comment, whitespace
+                       in executor.map(_loc_count_in_file_tuple, uncached_file_paths, chunksize=16)]
+    elif threads is not None:
+        # No pickling involved, so the worker can return Records directly.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            counted = list(executor.map(loc_count_in_file, uncached_file_paths))
+    else:
+        counted = [loc_count_in_file(file_path) for file_path in uncached_file_paths]
+
+    for file_path, line_count in zip(uncached_file_paths, counted):
+        line_count_per_path[file_path] = line_count
+        if cache is not None:
+            abs_path = os.path.abspath(file_path)
+            stat = os.stat(abs_path)
+            cache[abs_path] = (stat.st_mtime_ns, stat.st_size,
+                              line_count.code, line_count.comment, line_count.whitespace)
+
+    if cache is not None:
+        _save_cache(cache)
+
+    file_path_iter = iter(file_paths)
+    folders = {}
+    for dirpath, (counted_filenames, unhidden_subdirnames) in folder_contents.items():
+        files = [_File(filename, line_count_per_path[next(file_path_iter)]) for filename in counted_filenames]
         folders[dirpath] = _Folder(dirpath, files, unhidden_subdirnames)
 
     if add_subfolders:
-        # Go through in order of length of path, as a string, from longest to shortest. This guarantees that we evaluate
-        # all deeper folders before we evaluate shallower ones.
-        for folder_name, folder in sorted(folders.items(), key=lambda x: len(x[0]))[::-1]:
-            folder.add_lines_from_subfolders(folders)
+        # A post-order traversal from the root guarantees that all deeper folders are rolled up before their
+        # parents, without needing to sort every path. (Sorting by path length was also subtly wrong for sibling
+        # paths of different name lengths, e.g. 'a/bb' vs 'aa/b'.)
+        _add_lines_from_subfolders(folders, folder_path)
 
     if print_result:
         _print_result(print_files, print_folders, folders, print_fn, folder_path, include_zero)
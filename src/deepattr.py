@@ -1,3 +1,18 @@
+import functools as ft
+import re
+
+
+# Tokenizes e.g. 'b.c[5].e' into ['b', 'c', '5]', 'e'] in a single pass. (']' deliberately isn't excluded, so that
+# indexing tokens keep their trailing ']' for _getattritem et al. to dispatch on.)
+_token_pattern = re.compile(r'[^.\[]+')
+
+
+@ft.lru_cache(maxsize=1024)
+def _split_name(name):
+    # Attribute paths tend to be string literals used over and over, so the parse is memoized.
+    return _token_pattern.findall(name)
+
+
 def _getattritem(o, name):
     if len(name) > 1 and ']' == name[-1]:
         try:
@@ -30,10 +45,7 @@ def _delattritem(o, name):
 
 def _deep_locate_variable(o, name):
     """Used to extend getattr etc. to finding subattributes."""
-    _variable_descent = name.split('.')
-    variable_descent = []
-    for var in _variable_descent:
-        variable_descent.extend(var.split('['))
+    variable_descent = _split_name(name)
 
     next_variable = o
     for next_variable_name in variable_descent[:-1]:
@@ -72,11 +84,16 @@ def deephasattr(o, name):
         >>> deephasattr(a, 'b.c[5].e')
     """
     try:
-        deepgetattr(o, name)
+        penultimate_variable, last_variable_name = _deep_locate_variable(o, name)
     except AttributeError:
         return False
-    else:
+    if len(last_variable_name) > 1 and ']' == last_variable_name[-1]:
+        try:
+            penultimate_variable[int(last_variable_name[:-1])]
+        except (TypeError, IndexError):
+            return False
         return True
+    return hasattr(penultimate_variable, last_variable_name)
 
 
 def deepsetattr(o, name, value):
@@ -7,18 +7,27 @@ def extract_keys(dict, keys, no_key_val=_sentinel):
     argument :no_key_val: can be set to what value missing keys should take in the returned dictionary."""
 
     return_dict = {}
+    has_no_key_val = no_key_val is not _sentinel
     for key in keys:
-        val = dict.pop(key, no_key_val)
+        val = dict.get(key, _sentinel)
         if val is not _sentinel:
             return_dict[key] = val
+            # Only mutate the dictionary for keys actually present; missing keys cost a single lookup.
+            del dict[key]
+        elif has_no_key_val:
+            return_dict[key] = no_key_val
     return return_dict
 
 
 def update_without_overwrite(dict1, dict2):
-    """As dict.update, except that existing keys in :dict1: are not overwritten with matching keys in :dict2:."""
-    for k, v in dict2.items():
-        if k not in dict1:
-            dict1[k] = v
+    """As dict.update, except that existing keys in :dict1: are not overwritten with matching keys in :dict2:.
+
+    New keys are inserted in :dict2:'s order.
+    """
+
+    for key, val in dict2.items():
+        if key not in dict1:
+            dict1[key] = val
 
 
 def safe_add(dict, key, val):
@@ -2,32 +2,46 @@ import itertools
 import math
 
 
+# The preferred 'go forever' sentinel for rangeinf; saves callers importing math themselves.
+INF = math.inf
+
+
 def rangeinf(start, stop=None, step=1):
-    """Acts as range, however passing stop=math.inf or np.inf will have it go forever."""
+    """Acts as range, however passing stop=math.inf or np.inf (or INF, from this module) will have it go forever."""
     # Allows us to pass just one argument and has it act as 'stop', with 'start' set to zero. This is the same
     # behaviour as the usual range function
     if stop is None:
         stop = start
         start = 0
-    if stop == math.inf:  # Also True for numpy.inf
+    # The float check means integer bounds - the common case - skip the comparison against infinity. isinstance
+    # rather than an exact-type check, as np.float64(np.inf) must take the infinite branch too.
+    if isinstance(stop, float) and stop == math.inf:
         return itertools.count(start, step)
     else:
         return range(start, stop, step)
 
 
+_sentinel = object()
+
+
 def single_true(iterable):
     """Checks that precisely one element of the iterable is truthy."""
-    i = iter(iterable)
-    return any(i) and not any(i)
+    # filter(None, ...) skips over falsy elements entirely in C, which is quicker than any() doing so.
+    i = filter(None, iter(iterable))
+    if next(i, _sentinel) is _sentinel:
+        return False
+    return next(i, _sentinel) is _sentinel
 
 
 def slice_pieces(sliceable, length):
     """Cuts a sliceable object into pieces of length 'length', and yields them one at a time."""
     if not sliceable:
         yield sliceable
-    while sliceable:
-        piece, sliceable = sliceable[:length], sliceable[length:]
-        yield piece
+        return
+    # Index into the original object rather than repeatedly re-slicing the tail, which would copy the remainder on
+    # every iteration (quadratic overall).
+    for i in range(0, len(sliceable), length):
+        yield sliceable[i:i + length]
 
 
 class ResetableGenerator:
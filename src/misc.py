@@ -1,16 +1,64 @@
-import inspect
+import functools as ft
 import os
 import random
 import string
-import uuid as uuid_
+import sys
+import threading
+
+
+# Entropy for uuid is drawn from os.urandom a block at a time and sliced per call, amortising the underlying syscall
+# over many identifiers. The buffer is thread-local, so no locking is needed.
+_entropy = threading.local()
+_entropy_block_size = 4096
+
+
+def _random_bytes(nbytes):
+    if nbytes > _entropy_block_size // 2:
+        # Too large to be worth pooling.
+        return os.urandom(nbytes)
+    try:
+        # A forked child inherits the parent's buffer and offset, and must not hand out the same bytes the parent
+        # will; checking the pid discards the inherited pool.
+        if _entropy.pid != os.getpid():
+            raise AttributeError
+        buffer = _entropy.buffer
+        offset = _entropy.offset
+    except AttributeError:
+        buffer = b''
+        offset = 0
+    if offset + nbytes > len(buffer):
+        buffer = os.urandom(_entropy_block_size)
+        _entropy.buffer = buffer
+        _entropy.pid = os.getpid()
+        offset = 0
+    _entropy.offset = offset + nbytes
+    return buffer[offset:offset + nbytes]
 
 
 def uuid(trunc=32):
     """Returns a unique identifier in hex.
-    
+
     Can be optionally truncated to a shorter string via the argument :trunc:. The result should still be properly
     random. """  # I think
-    return uuid_.uuid4().hex[:trunc]
+    # Reading from os.urandom directly skips building a UUID object and formatting it, which is all uuid4().hex does
+    # anyway (minus the version bits, which we don't care about here).
+    return _random_bytes((trunc + 1) >> 1).hex()[:trunc]
+
+
+# There are only 16 possible pools, so they're cached rather than rebuilt on every call.
+@ft.lru_cache(maxsize=None)
+def _uuid2_pool(digits, lowercase, uppercase, hexdigits):
+    pool = ''
+    if digits:
+        pool += string.digits
+    if lowercase:
+        pool += string.ascii_lowercase
+    if uppercase:
+        pool += string.ascii_uppercase
+    if hexdigits:
+        pool += string.hexdigits
+    # Deduplicate (hexdigits overlaps all the others) whilst keeping a stable order.
+    return ''.join(dict.fromkeys(pool))
 
 
 def uuid2(len=8, digits=True, lowercase=True, uppercase=False, hexdigits=False):
@@ -22,27 +70,29 @@ def uuid2(len=8, digits=True, lowercase=True, uppercase=False, hexdigits=False):
 
     if not (digits or lowercase or uppercase or hexdigits):
         raise ValueError("At least one of the 'digits', 'lowercase', 'uppercase', 'hexdigits' arguments must be True.")
-    valid_elements = set()
-    if digits:
-        valid_elements.update(string.digits)
-    if lowercase:
-        valid_elements.update(string.ascii_lowercase)
-    if uppercase:
-        valid_elements.update(string.ascii_uppercase)
-    if hexdigits:
-        valid_elements.update(string.hexdigits)
-    valid_elements = list(valid_elements)
 
-    return ''.join(random.choice(valid_elements) for _ in range(len))
+    # random.choices samples all the characters in a single call, which is substantially quicker than calling
+    # random.choice once per character.
+    return ''.join(random.choices(_uuid2_pool(digits, lowercase, uppercase, hexdigits), k=len))
 
 
-def safe_issubclass(cls, classinfo):
-    """As the builtin issubclass, but returns False instead of a TypeError if the first argument is not a class."""
+@ft.lru_cache(maxsize=2048)
+def _safe_issubclass(cls, classinfo):
     try:
         return issubclass(cls, classinfo)
     except TypeError:  # cls is not actually a class
         return False
 
+
+def safe_issubclass(cls, classinfo):
+    """As the builtin issubclass, but returns False instead of a TypeError if the first argument is not a class."""
+    # Memoized: issubclass walks the MRO (and may call __subclasshook__), which adds up in hot dispatch paths.
+    try:
+        return _safe_issubclass(cls, classinfo)
+    except TypeError:
+        # Unhashable arguments can't go through the cache; they're certainly not classes either.
+        return False
+
     
 def random_function(*args):
     """Picks one of its arguments uniformly at random, calls it, and returns the result.
@@ -51,8 +101,8 @@ def random_function(*args):
     >>> random_function(lambda: numpy.uniform(-2, -1), lambda: numpy.uniform(1, 2))
     """
     
-    choice = random.randint(0, len(args) - 1)
-    return args[choice]()
+    # random.choice does the index draw in a single C call, unlike randint's Python-level bit twiddling.
+    return random.choice(args)()
     
 
 # https://stackoverflow.com/questions/37792112/python-file-of-the-caller
@@ -61,8 +111,13 @@ def file_loc():
 
     Example: calling file_loc() in the file located at /home/example_user/example_file.py will return the string
     '/home/example_user/example_file.py'
+
+    (If you only need this at module top level then os.path.dirname(__file__) is simpler and quicker still; this
+    function exists for the cases where the calling file isn't statically known.)
     """
-    return os.path.dirname(inspect.stack()[1][1])
+    # sys._getframe just grabs the caller's frame, whereas inspect.stack() builds FrameInfos for the whole call stack
+    # (reading each frame's source file along the way). CPython-specific, but so are we, practically speaking.
+    return os.path.dirname(sys._getframe(1).f_code.co_filename)
 
 
 def assert_equal(o1, o2, getter=lambda x: x, error_msg='{o1} and {o2} are not equal'):
@@ -91,6 +146,8 @@ class AddBase:
 
 class ContainsAll:
     """Instances of this class always returns true when testing if something is contained in it."""
+    __slots__ = ()
+
     def __contains__(self, item):
         return True
 
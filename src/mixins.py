@@ -1,9 +1,6 @@
 import copy
 import itertools
 
-from . import misc
-from . import strings
-
 
 class NoneAttributesMixin:
     """Accessing attributes which do not exist will return None instead of raising an AttributeError."""
@@ -22,6 +19,8 @@ class DynamicSubclassingMixin:
     (usually) actually class-level properties, and thus a simple self.__class__ = Foo statement would then suffice."""
     _instance_properties = dict()
     _all_instance_properties = dict()
+    # Caches the attribute changes needed to move between a particular pair of classes; see set_subclass.
+    _transition_cache = dict()
 
     def __init__(self):
         for key, val in self._all_instance_properties.items():
@@ -42,17 +41,24 @@ class DynamicSubclassingMixin:
 
     def set_subclass(self, subclass):
         """Sets the class of the instance to the specified subclass."""
-        existing_class_attr_names = set(self._all_instance_properties.keys())
-        new_instance_properties = subclass._all_instance_properties
-        new_subclass_attr_names = set(new_instance_properties.keys())
-
-        attrs_to_remove = existing_class_attr_names.difference(new_subclass_attr_names)
-        attrs_to_add = new_subclass_attr_names.difference(existing_class_attr_names)
+        # The attribute changes needed only depend on the (from, to) pair of classes, so we cache them; repeatedly
+        # flipping between the same pair of classes (e.g. a state machine) then skips the set arithmetic.
+        try:
+            attrs_to_remove, attrs_to_add = self._transition_cache[type(self), subclass]
+        except KeyError:
+            existing_class_attr_names = set(self._all_instance_properties.keys())
+            new_instance_properties = subclass._all_instance_properties
+            new_subclass_attr_names = set(new_instance_properties.keys())
+
+            attrs_to_remove = tuple(existing_class_attr_names.difference(new_subclass_attr_names))
+            attrs_to_add = tuple((attr, new_instance_properties[attr])
+                                 for attr in new_subclass_attr_names.difference(existing_class_attr_names))
+            self._transition_cache[type(self), subclass] = (attrs_to_remove, attrs_to_add)
 
         for attr in attrs_to_remove:
             delattr(self, attr)
-        for attr in attrs_to_add:
-            setattr(self, attr, copy.deepcopy(new_instance_properties[attr]))
+        for attr, initial_value in attrs_to_add:
+            setattr(self, attr, copy.deepcopy(initial_value))
 
         self.__class__ = subclass
 
@@ -160,6 +166,11 @@ def dynamic_subclassing_by_attr(tracking_attr):
     return DynamicSubclassingByAttrMixin
 
 
+# Used to generate unique attribute names when adding iterables to Containers; see
+# _ContainerMetaclass.__add__ below.
+_container_item_counter = itertools.count()
+
+
 class _ContainerMetaclass(type):
     def __contains__(cls, item):
         if cls is Container:
@@ -195,8 +206,10 @@ class _ContainerMetaclass(type):
                 if parent is not Container:
                     for item in parent.items():
                         yield item
+        # strings.is_magic inlined here: it's called once per attribute, and slicing avoids paying for a
+        # Python-level function call each time.
         for key, val in itertools.chain(cls.__dict__.items(), parent_items()):
-            if not strings.is_magic(key):
+            if not (key[:2] == '__' and key[-2:] == '__'):
                 yield key, val
 
     def keys(cls):
@@ -211,10 +224,10 @@ class _ContainerMetaclass(type):
         if isinstance(other, _ContainerMetaclass):
             other_class = other
         else:  # Convert 'other' into a class we can inherit from
-            class other_class(Container):
-                pass
-            for item in other:
-                setattr(other_class, misc.uuid(), item)
+            # The items of 'other' are anonymous values, so the attribute names we store them under don't matter
+            # beyond being unique; cheap sequential names are much quicker than generating a uuid per item.
+            attrs = {f'_container_item_{next(_container_item_counter)}': item for item in other}
+            other_class = type('Container', (Container,), attrs)
 
         class ContainerCombined(cls, other_class):
             pass
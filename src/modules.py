@@ -22,9 +22,8 @@ def endow_attrs(name, attrs):
     module = sys.modules[name]
     old_cls = module.__class__
 
-    class CallableModule(old_cls, CallableModuleBase):
-        pass
-    for key, val in attrs.items():
-        setattr(CallableModule, key, val)
+    # A single type() call builds the class with all its attributes at once, skipping the class-statement machinery
+    # (__build_class__ etc.) plus a setattr per attribute.
+    CallableModule = type('CallableModule', (old_cls, CallableModuleBase), dict(attrs))
     module.__class__ = CallableModule
     return module, old_cls
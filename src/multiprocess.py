@@ -1,4 +1,4 @@
-import logging
+import os
 import sys
 
 
@@ -27,15 +27,17 @@ def set_multiprocessing(mp=None):
 
     # Import or set multiprocessing
     if mp is None:
-        import multiprocessing as mp_
+        import multiprocessing
+        # fork is effectively free on Linux, whereas spawn re-imports the world in every child; elsewhere fork is
+        # either unavailable (Windows) or unreliable (macOS), so spawn it is. Pass mp explicitly to override.
+        mp_ = multiprocessing.get_context('fork' if sys.platform.startswith('linux') else 'spawn')
     else:
         mp_ = mp
 
     # Replace the fake ProcessFake base class with the actual multiprocessing.Process class.
-    orig_bases = RedirectedOutputProcess.__bases__
-    ind = orig_bases.index(ProcessFake)
-    new_bases = tuple(mp_.Process if i == ind else x for i, x in enumerate(orig_bases))
-    RedirectedOutputProcess.__bases__ = new_bases
+    # RedirectedOutputProcess has exactly one base, so it's written directly rather than searching and rebuilding
+    # the bases tuple. (Revisit if it ever grows another base.)
+    RedirectedOutputProcess.__bases__ = (mp_.Process,)
     # For the record, two other plausible things which don't work here:
     # - Defining RedirectedOutputProcess dynamically (i.e. wrapping it in a function which takes multiprocessing as an
     #   argument). This fails to pickle because then it's not defined at the module level.
@@ -102,35 +104,79 @@ class RedirectedOutputProcess(ProcessFake):
         self.stderr = stderr
         super(RedirectedOutputProcess, self).__init__(*args, **kwargs)
 
+    @staticmethod
+    def _redirect_fd(stream, fd):
+        # If the target has a real file descriptor then redirect at the fd level too, so that writes from C
+        # extensions and grandchild processes are captured as well. (Assigning sys.stdout only catches Python-level
+        # writes.) Targets without one - StreamToLogger, StreamToQueue, StringIO - just skip this.
+        try:
+            fileno = stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            return
+        os.dup2(fileno, fd)
+
     def run(self):
         if self.stdout is not None:
             sys.stdout = self.stdout
+            self._redirect_fd(self.stdout, 1)
         if self.stderr is not None:
             sys.stderr = self.stderr
-        super(RedirectedOutputProcess, self).run()
+            self._redirect_fd(self.stderr, 2)
+        try:
+            super(RedirectedOutputProcess, self).run()
+        finally:
+            # Flush explicitly: the interpreter's exit-time flush of the std streams happens after multiprocessing
+            # has already finalized things like queue feeder threads, by which point anything still buffered in the
+            # target (e.g. StreamToQueue's final batch) would be silently lost.
+            if self.stdout is not None:
+                self.stdout.flush()
+            if self.stderr is not None:
+                self.stderr.flush()
 
 
 # Courtesy of https://github.com/jdloft/multiprocess-logging/blob/master/main.py
 class StreamToLogger:
     """Converts streams (stdout or stderr for example) to logs."""
 
-    def __init__(self, logger, log_level=logging.INFO, **kwargs):
+    def __init__(self, logger, log_level=None, **kwargs):
         """Arguments:
             logger: A logger to log the stream to.
-            log_level: The level to log at.
+            log_level: The level to log at. Defaults to logging.INFO.
         """
 
+        # logging is imported lazily (here and in LogOutputProcess): it's a hefty module with import-time side
+        # effects, and the queue-based classes in this file don't need it at all.
+        import logging
+        if log_level is None:
+            log_level = logging.INFO
+
         self.logger = logger
         self.log_level = log_level
         self.linebuf = ''
+        # Binding the log method once saves an attribute resolution per line. (Enabledness deliberately isn't
+        # snapshotted here: logging is often configured after these writers are constructed, e.g. basicConfig between
+        # creating a process and starting it, and Logger.log already does the isEnabledFor check itself.)
+        self._log = logger.log
         super(StreamToLogger).__init__(**kwargs)
 
     def write(self, buf):
-        for line in buf.rstrip().splitlines():
-            self.logger.log(self.log_level, line.rstrip())
+        # A write needn't end on a line boundary, so any trailing partial line is held in linebuf until the next
+        # write (or flush) completes it; everything before it is whole lines.
+        data = self.linebuf + buf
+        lines = data.split('\n')
+        self.linebuf = lines.pop()
+        log = self._log
+        log_level = self.log_level
+        for line in lines:
+            line = line.rstrip()
+            if line:
+                log(log_level, line)
 
     def flush(self):
-        pass
+        line = self.linebuf.rstrip()
+        self.linebuf = ''
+        if line:
+            self._log(self.log_level, line)
 
 
 class LogOutputProcess(RedirectedOutputProcess):
@@ -138,7 +184,7 @@ class LogOutputProcess(RedirectedOutputProcess):
 
     def __init__(self, *args, logger=None,
                  stdout_logger=None, stderr_logger=None,
-                 stdout_log_level=logging.INFO, stderr_log_level=logging.ERROR,
+                 stdout_log_level=None, stderr_log_level=None,
                  stdout=None, stderr=None, **kwargs):
         """Arguments:
             logger: The logger to redirect both stdout and stderr to.
@@ -152,6 +198,12 @@ class LogOutputProcess(RedirectedOutputProcess):
         Otherwise the same as multiprocessing.Process.
         """
 
+        import logging
+        if stdout_log_level is None:
+            stdout_log_level = logging.INFO
+        if stderr_log_level is None:
+            stderr_log_level = logging.ERROR
+
         if stdout_logger is None:
             stdout_logger = logger
         if stderr_logger is None:
@@ -165,7 +217,14 @@ class LogOutputProcess(RedirectedOutputProcess):
 
 
 class StreamToQueue:
-    """Puts the results of streams (stdout or stderr for example) on a queue."""
+    """Puts the results of streams (stdout or stderr for example) on a queue.
+
+    Lines are batched: each item placed on the queue is a list of lines, pushed whenever the batch reaches
+    _batch_size lines or the stream is flushed. (Each put on a multiprocessing queue takes a lock, pickles, and
+    writes to a pipe, so batching amortises that cost over many lines for chatty subprocesses.)
+    """
+
+    _batch_size = 32
 
     def __init__(self, queue, block=False, **kwargs):
         """Arguments:
@@ -176,14 +235,47 @@ class StreamToQueue:
 
         self.queue = queue
         self.block = block
+        self.linebuf = ''
+        self.lines = []
         super(StreamToQueue).__init__(**kwargs)
 
     def write(self, buf):
-        for line in buf.rstrip().splitlines():
-            self.queue.put(line.rstrip(), block=self.block)
+        # As in StreamToLogger.write, a trailing partial line is buffered until completed by a later write.
+        data = self.linebuf + buf
+        lines = data.split('\n')
+        self.linebuf = lines.pop()
+        batch = self.lines
+        for line in lines:
+            line = line.rstrip()
+            if line:
+                batch.append(line)
+        if len(batch) >= self._batch_size:
+            self._push()
+
+    def _push(self):
+        if self.lines:
+            self.queue.put(self.lines, block=self.block)
+            self.lines = []
 
     def flush(self):
-        pass
+        line = self.linebuf.rstrip()
+        self.linebuf = ''
+        if line:
+            self.lines.append(line)
+        self._push()
+
+
+def _resolve_queue_stream(stream, queue, default_queue, block, default_block):
+    """Resolves the stdout/stderr defaulting chains of QueueOutputProcess in one place."""
+    if stream is not None:
+        return stream
+    if queue is None:
+        queue = default_queue
+    if queue is None:
+        return None
+    if block is None:
+        block = default_block
+    return StreamToQueue(queue=queue, block=block)
 
 
 class QueueOutputProcess(RedirectedOutputProcess):
@@ -191,7 +283,7 @@ class QueueOutputProcess(RedirectedOutputProcess):
 
     def __init__(self, *args, queue=None, block=False,
                  stdout_queue=None, stderr_queue=None,
-                 stdout_block=False, stderr_block=False,
+                 stdout_block=None, stderr_block=None,
                  stdout=None, stderr=None,
                  **kwargs):
         """Arguments:
@@ -207,18 +299,6 @@ class QueueOutputProcess(RedirectedOutputProcess):
         Otherwise the same as multiprocessing.Process.
         """
 
-        if stdout_queue is None and queue is not None:
-            stdout_queue = queue
-        if stderr_queue is None and queue is not None:
-            stderr_queue = queue
-
-        if stdout_block is None and block is not None:
-            stdout_block = block
-        if stderr_queue is None and block is not None:
-            stderr_block = block
-
-        if stdout_queue is not None and stdout is None:
-                stdout = StreamToQueue(queue=stdout_queue, block=stdout_block)
-        if stderr_queue is not None and stderr is None:
-                stderr = StreamToQueue(queue=stderr_queue, block=stderr_block)
+        stdout = _resolve_queue_stream(stdout, stdout_queue, queue, stdout_block, block)
+        stderr = _resolve_queue_stream(stderr, stderr_queue, queue, stderr_block, block)
         super(QueueOutputProcess, self).__init__(*args, stdout=stdout, stderr=stderr, **kwargs)
@@ -1,9 +1,30 @@
+import functools as ft
 import math
 
 
+_math_list = ['acos', 'asin', 'atan', 'atan2', 'ceil', 'cos', 'cosh',
+              'degrees', 'e', 'exp', 'fabs', 'floor', 'fmod', 'frexp',
+              'hypot', 'ldexp', 'log', 'log10', 'modf', 'pi', 'pow',
+              'radians', 'sin', 'sinh', 'sqrt', 'tan', 'tanh']
+# Built once at import; math_eval would otherwise pay ~30 getattrs and a dict construction on every call.
+_math_dict = {name: getattr(math, name) for name in _math_list}
+_math_dict['abs'] = abs
+
+
+# Expressions tend to be evaluated repeatedly (think parameter sweeps), so the parse is memoized.
+@ft.lru_cache(maxsize=256)
+def _math_compile(string):
+    return compile(string, '<math_eval>', 'eval')
+
+
 def clamp(val, min_, max_):
     """Clamps :val: to the range between :min_: and :max_:"""
-    return min(max(val, min_), max_)
+    # Two comparisons are quicker than calling the variadic min/max builtins.
+    if val < min_:
+        return min_
+    if val > max_:
+        return max_
+    return val
 
 
 def round_mult(val, multiple, direction='round'):
@@ -13,18 +34,14 @@ def round_mult(val, multiple, direction='round'):
 
 
 def num_digits(n):
-    """Returns the number of digits in an integer :n:.
+    """Returns the number of digits in an integer :n:. (A minus sign counts as a digit.)"""
 
-    Source:
-    https://stackoverflow.com/a/2189827
-    """
-
-    if n > 0:
-        return int(math.log10(n)) + 1
-    elif n == 0:
-        return 1
+    # The previous log10-based version was both slower (a transcendental call) and subtly wrong near powers of ten,
+    # where floating-point rounding can give e.g. log10(1000) == 2.999...
+    if n >= 0:
+        return len(str(n))
     else:
-        return int(math.log10(-n)) + 2
+        return len(str(-n)) + 1
 
 
 def math_eval(string, subs=None):
@@ -56,19 +73,16 @@ def math_eval(string, subs=None):
     0.999664593620814
     """
 
-    math_list = ['acos', 'asin', 'atan', 'atan2', 'ceil', 'cos', 'cosh',
-                 'degrees', 'e', 'exp', 'fabs', 'floor', 'fmod', 'frexp',
-                 'hypot', 'ldexp', 'log', 'log10', 'modf', 'pi', 'pow',
-                 'radians', 'sin', 'sinh', 'sqrt', 'tan', 'tanh']
-    math_dict = {name: getattr(math, name) for name in math_list}
-    math_dict['abs'] = abs
-    if subs is not None:
+    if subs is None:
+        # No substitutions, so the shared dict can be used as-is without copying. (eval doesn't mutate it.)
+        math_dict = _math_dict
+    else:
+        math_dict = _math_dict.copy()
         if hasattr(subs, 'items'):
-            for key, val in subs.items():
-                math_dict[key] = val
+            math_dict.update(subs)
         else:
             math_dict['x'] = subs
-    return eval(string, {'__builtins__': None}, math_dict)
+    return eval(_math_compile(string), {'__builtins__': None}, math_dict)
 
 
 # https://stackoverflow.com/questions/783897/truncating-floats-in-python
@@ -1,10 +1,25 @@
-import collections as co
+import functools as ft
+import itertools
 import re
 
 
+# The same delimiters/patterns tend to be used over and over, so the compiled patterns are memoized. (re has its own
+# internal cache, but going through it still pays for the escape+join each call.)
+@ft.lru_cache(maxsize=256)
+def _compile_split(delimiters):
+    return re.compile('|'.join(map(re.escape, delimiters)))
+
+
+@ft.lru_cache(maxsize=256)
+def _compile(pattern):
+    return re.compile(pattern)
+
+
 def is_magic(item):
     """Whether or not the specified string is __magic__"""
-    return item.startswith('__') and item.startswith('__')
+    # Slice comparisons rather than method dispatch. (This also fixes the old version testing startswith twice,
+    # which made anything with a leading dunder count as magic.)
+    return len(item) >= 4 and item[:2] == '__' == item[-2:]
 
 
 def split(delimiters, string, maxsplit=0):
@@ -13,17 +28,16 @@ def split(delimiters, string, maxsplit=0):
     Source:
     https://stackoverflow.com/a/13184791
     """
-    regex_pattern = '|'.join(map(re.escape, delimiters))
-    return re.split(regex_pattern, string, maxsplit)
+    return _compile_split(tuple(delimiters)).split(string, maxsplit)
 
 
 def find_nth(haystack, needle, n):
     """Finds the nth occurrence of a substring 'needle' in a larger string 'haystack'."""
-    start = haystack.find(needle)
-    while start >= 0 and n > 1:
-        start = haystack.find(needle, start + len(needle))
-        n -= 1
-    return start
+    # A single C-level regex scan, rather than n restarting str.find calls. (Occurrences are non-overlapping, as
+    # before.)
+    matches = _compile(re.escape(needle)).finditer(haystack)
+    match = next(itertools.islice(matches, max(n - 1, 0), None), None)
+    return -1 if match is None else match.start()
 
 
 def re_sub_recursive(pattern, sub, inputstr):
@@ -32,15 +46,16 @@ def re_sub_recursive(pattern, sub, inputstr):
     :str pattern: The regex pattern
     :str sub: What to substitute the regex pattern for.
     :str inputstr: The string to perform the substitutions on."""
-    patt = re.compile(pattern)
-
-    old_inputstr = inputstr
-    inputstr = patt.sub(sub, inputstr)
-    while old_inputstr != inputstr:
-        old_inputstr = inputstr
-        inputstr = patt.sub(sub, inputstr)
+    patt = _compile(pattern)
 
-    return inputstr
+    # subn reports whether anything was substituted, so the final (no-op) iteration skips the full-string equality
+    # check. The equality test is still needed on productive iterations, lest a substitution that maps a string to
+    # itself loop forever.
+    while True:
+        new_inputstr, count = patt.subn(sub, inputstr)
+        if count == 0 or new_inputstr == inputstr:
+            return new_inputstr
+        inputstr = new_inputstr
 
 
 class String(str):
@@ -59,8 +74,15 @@ class UniqueString:
             format_string: Should be a string containing '{string}' and/or '{index}', which will specify the output
                 format of the disambiguated string. Defaults to '{string}{index}'.
         """
-        self.counter = co.defaultdict(lambda: 0)
+        # A plain dict plus .get: defaultdict would invoke its (Python-level) factory on every miss.
+        self.counter = {}
         self.format_string = format_string
+        # The default format is special-cased to plain concatenation, as str.format re-parses its spec every call;
+        # other formats at least get the bound method resolved once here.
+        if format_string == '{string}{index}':
+            self._format = None
+        else:
+            self._format = format_string.format
 
     def __call__(self, string):
         """See UniqueString.__doc__.
@@ -72,9 +94,12 @@ class UniqueString:
             The disambiguated string. It will have an 'original_string' attribute storing the string before
             disambiguation.
         """
-        index = self.counter[string]
-        self.counter[string] += 1
-        formatted_string = self.format_string.format(string=string, index=index)
+        index = self.counter.get(string, 0)
+        self.counter[string] = index + 1
+        if self._format is None:
+            formatted_string = f'{string}{index}'
+        else:
+            formatted_string = self._format(string=string, index=index)
         formatted_string = String(formatted_string)
         formatted_string.original_string = string
         return formatted_string
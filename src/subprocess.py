@@ -5,4 +5,62 @@ def shell(cmd, **kwargs):
     """Runs the given :cmd: in the shell and returns its stdout as a string. Additional :kwargs: are passed to the call
     to subprocess.run.
     """
-    return subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, **kwargs).stdout.decode('utf-8')
+    # text=True has the output decoded incrementally as it's read, rather than us decoding (and so copying) the whole
+    # buffer at the end.
+    return subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, text=True, **kwargs).stdout
+
+
+class ShellPool:
+    """A single long-lived shell that many commands can be run in, one after the other.
+
+    Spawning a shell per command (as the shell function above does) pays a fork+exec every time, which dominates when
+    running many small commands; a ShellPool keeps one shell alive and feeds it commands over a pipe instead.
+
+    Note that the commands share one shell process, so state (environment variables, working directory) persists
+    between them, and stderr is not captured.
+
+    Example:
+    >>> with ShellPool() as sh:
+    ...     sh.run('cd /tmp')
+    ...     sh.run('pwd')
+    '/tmp\\n'
+    """
+
+    _sentinel = '__tools_shell_pool_done__'
+
+    def __init__(self, **kwargs):
+        self.process = subprocess.Popen(['sh'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, bufsize=-1, universal_newlines=True)
+        self.returncode = None
+        super(ShellPool, self).__init__(**kwargs)
+
+    def run(self, cmd):
+        """Runs the given :cmd: in the pooled shell and returns its stdout as a string. The command's exit status is
+        recorded on the returncode attribute.
+        """
+        process = self.process
+        process.stdin.write(f'{cmd}\necho {self._sentinel}$?\n')
+        process.stdin.flush()
+        out = []
+        for line in process.stdout:
+            # partition rather than startswith: a command whose output lacks a trailing newline would otherwise glue
+            # itself onto the sentinel line.
+            before, sentinel, status = line.partition(self._sentinel)
+            if sentinel:
+                self.returncode = int(status)
+                if before:
+                    out.append(before)
+                break
+            out.append(line)
+        return ''.join(out)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -10,9 +10,23 @@ def time_func(func):
     """
 
     def timed(*args, **kwargs):
-        start = time.time()
+        # perf_counter_ns rather than time: it's monotonic (no wall-clock jumps), much higher resolution, and the
+        # integer return avoids a float conversion inside the timed region.
+        start = time.perf_counter_ns()
         func(*args, **kwargs)
-        end = time.time()
+        end = time.perf_counter_ns()
+        return (end - start) * 1e-9
+
+    return timed
+
+
+def time_func_ns(func):
+    """As time_func, but returns integer nanoseconds rather than float seconds."""
+
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        func(*args, **kwargs)
+        end = time.perf_counter_ns()
         return end - start
 
     return timed
@@ -23,10 +37,28 @@ def compose(*fns):
 
     assert len(fns) > 0
 
+    # Small compositions are the common case, and the specialised closures below skip the Python-level loop for them.
+    if len(fns) == 1:
+        return fns[0]
+    if len(fns) == 2:
+        f, g = fns
+
+        def composed(*args, **kwargs):
+            return f(g(*args, **kwargs))
+        return composed
+    if len(fns) == 3:
+        f, g, h = fns
+
+        def composed(*args, **kwargs):
+            return f(g(h(*args, **kwargs)))
+        return composed
+
+    first = fns[-1]
+    rest = fns[-2::-1]  # Reversed once here, rather than sliced on every call.
+
     def composed(*args, **kwargs):
-        fn = fns[-1]
-        x = fn(*args, **kwargs)
-        for fn in fns[-2::-1]:
+        x = first(*args, **kwargs)
+        for fn in rest:
             x = fn(x)
         return x
     return composed
@@ -45,6 +77,8 @@ class getitemfn:
     >>> g[4]
     16
     """
+    __slots__ = ('fn',)
+
     def __init__(self, fn, **kwargs):
         self.fn = fn
         super(getitemfn, self).__init__(**kwargs)
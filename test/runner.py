@@ -5,5 +5,6 @@ loc = os.path.dirname(__file__)
 loader = unittest.defaultTestLoader
 suite = loader.discover(loc)
 
-runner = unittest.TextTestRunner()
+# buffer=True swallows test stdout/stderr unless the test fails, which keeps the output clean and saves the flushes.
+runner = unittest.TextTestRunner(buffer=True)
 result = runner.run(suite)
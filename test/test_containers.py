@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 from src import containers as con
@@ -35,3 +37,61 @@ class TestRecord(unittest.TestCase):
         self.assertEqual(type(rec), type(rec2))
         self.assertNotEqual(type(rec), type(rec3))
         self.assertNotEqual(type(rec), con.Record)
+
+
+class TestSortedDict(unittest.TestCase):
+    def test_sorting(self):
+        d = con.SortedDict()
+        d['b'] = 1
+        d['a'] = 2
+        d['c'] = 3
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+        d['a'] = 4  # Overwriting shouldn't change the order
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+        self.assertEqual(d['a'], 4)
+        del d['b']
+        self.assertEqual(list(d), ['a', 'c'])
+
+    def test_bypassing_mutators(self):
+        # clear/pop/popitem don't go through __setitem__/__delitem__, and used to leave the internal sort order
+        # stale, so that later insertions could land out of order.
+        d = con.SortedDict()
+        d['b'] = 1
+        d['a'] = 2
+        d.clear()
+        d['a'] = 10
+        d['c'] = 11
+        d['b'] = 12
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+
+        d.pop('b')
+        d['b'] = 13
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+
+        d.popitem()
+        d['c'] = 14
+        self.assertEqual(list(d), ['a', 'b', 'c'])
+
+    def test_sorted_object(self):
+        obj = con.SortedObject()
+        obj.b = 1
+        obj.a = 2
+        obj.c = 3
+        self.assertEqual(list(obj.keys()), ['a', 'b', 'c'])
+
+    def test_copy_and_pickle(self):
+        # The internal sort order mustn't travel with the copy/pickle state: stale state either crashed the
+        # reconstruction (SortedDict) or got inserted as an actual key (SortedObject).
+        d = con.SortedDict()
+        d['b'] = 1
+        d['a'] = 2
+        obj = con.SortedObject(b=1, a=2)
+        for original in (d, obj):
+            for roundtrip in (copy.copy, copy.deepcopy, lambda x: pickle.loads(pickle.dumps(x))):
+                with self.subTest(type=type(original).__name__, roundtrip=roundtrip):
+                    new = roundtrip(original)
+                    self.assertEqual(type(new), type(original))
+                    self.assertNotIn('_sorted_keys', new)
+                    self.assertEqual(list(new.items()), [('a', 2), ('b', 1)])
+                    new['aa'] = 3
+                    self.assertEqual(list(new), ['a', 'aa', 'b'])
@@ -1,16 +1,17 @@
-import time
 import unittest
+from unittest import mock
 
 from src import wrapper
 
 
 class TestTimeFunc(unittest.TestCase):
     def test_basic(self):
+        # The clock is mocked rather than actually sleeping: the test is about time_func returning the elapsed
+        # delta, not about the scheduler, and real sleeps added a second of wall-clock time to every run.
         for i in [0.1, 0.2, 0.3, 0.4]:
-            def test_fun():
-                time.sleep(i)
-            timed_fn = wrapper.time_func(test_fun)
-            self.assertAlmostEqual(timed_fn(), i, delta=0.005)
+            with mock.patch.object(wrapper.time, 'perf_counter_ns', side_effect=[0, int(i * 1e9)]):
+                timed_fn = wrapper.time_func(lambda: None)
+                self.assertAlmostEqual(timed_fn(), i)
 
 
 class TestCompose(unittest.TestCase):
@@ -33,7 +34,9 @@ class TestCompose(unittest.TestCase):
         self.assertEqual(x, [(1, 2), {'hi': 'exa'}, 3, 5])
 
         c(4, 5, exa='hi')
-        self.assertEqual(x, [(1, 2), {'hi': 'exa'}, 3, 5, (4, 5), {'exa': 'hi'}, 3, 5])
+        # Only the entries appended by the second call; the first four were checked above, and a failure diff now
+        # points at what the second call actually did.
+        self.assertEqual(x[4:], [(4, 5), {'exa': 'hi'}, 3, 5])
 
 
 class TestGetItemFn(unittest.TestCase):